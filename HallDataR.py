@@ -15,14 +15,89 @@
 #  
 
 import visa
+import bisect
+import concurrent.futures
 import datetime
 import time
-import os.path
-import dateutil.parser
+import os
+import queue
+import sys
+import threading
+import numpy as np
+
+class _Metronome:
+    """
+    Waits out a fixed interval measured against absolute monotonic deadlines,
+    so time spent between waits doesn't add up as drift. Ticks missed while
+    the caller was busy are skipped rather than fired back to back. Uses a
+    timerfd where the platform has one (Linux, python 3.13+) and falls back
+    to sleeping until the next deadline elsewhere
+    """
+    def __init__(self, interval):
+        """
+        Starts the metronome. The first tick is one interval from now
+        
+        :param interval: the time between ticks in seconds
+        """
+        self.interval = interval
+        if hasattr(os, "timerfd_create"):
+            self._fd = os.timerfd_create(time.CLOCK_MONOTONIC)
+            os.timerfd_settime(self._fd, initial=interval, interval=interval)
+        else:
+            self._fd = None
+            self._deadline = time.monotonic() + interval
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def wait(self):
+        """
+        Blocks until the next tick
+        """
+        if self._fd is not None:
+            os.read(self._fd, 8)
+        else:
+            now = time.monotonic()
+            #like a timerfd, fold every tick that has already passed into one
+            if self._deadline <= now:
+                while self._deadline <= now:
+                    self._deadline += self.interval
+            else:
+                time.sleep(self._deadline - now)
+                self._deadline += self.interval
+
+    def close(self):
+        """
+        Releases the timerfd, if one was created
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+def _column(name, doc):
+    """
+    Makes a read only property exposing one field of the measurement records
+    
+    :param name: the name of the field in HallDataR.record_dtype
+    :param doc: the docstring of the property
+    :returns: a property giving a view of the recorded values of the field.
+              The view is stale once the buffer is reallocated
+    """
+    return property(lambda self: self._rec[name][:self._i], doc=doc)
 
 class HallDataR:
     """
     Records and stores data for the hall effect experiment
+    
+    Measurements are exposed as numpy arrays (times, diodevs, currs, ...)
+    rather than lists. Each is a view of the recorded part of an internal
+    buffer, so it doesn't grow as more measurements are taken, and it stops
+    tracking the data once preallocate (or measure, when the buffer is full,
+    or import_from_csv) replaces the buffer. Take .copy() to keep values,
+    or read the property again to see new ones
     """
     time_constants = [10e-6,30e-6,100e-6,300e-6,
                       1e-3,3e-3,10e-3,30e-3,100e-3,300e-3,
@@ -32,7 +107,33 @@ class HallDataR:
                    1e-6,2e-6,5e-6,10e-6,20e-6,50e-6,100e-6,200e-6,500e-6,
                    1e-3,2e-3,5e-3,10e-3,20e-3,50e-3,100e-3,200e-3,500e-3,
                    1.0]
-
+    #setting number of each time constant and sensitivity
+    _tc_index = {value: i for i, value in enumerate(time_constants)}
+    _sens_index = {value: i for i, value in enumerate(sensitivities)}
+    #names of the columns of measurement data, in csv order
+    columns = ("diodev", "curr", "field", "ef_v", "ef_o", "bf_v", "bf_o",
+               "ad_v", "ad_o", "freq")
+    #one measurement: the time it was taken at, then every column
+    record_dtype = np.dtype([("time", "datetime64[us]")]
+                            + [(name, np.float64) for name in columns])
+    times = _column("time", "times that each sample was taken at")
+    diodevs = _column("diodev", "temperature sensing diode voltages")
+    currs = _column("curr", "currents through the magnet")
+    fields = _column("field",
+                     "magnetic field in tesla (== coil constant * currs)")
+    ef_vs = _column("ef_v", "EF voltage R")
+    ef_os = _column("ef_o", "EF voltage theta")
+    bf_vs = _column("bf_v", "BF voltage R")
+    bf_os = _column("bf_o", "BF voltage theta")
+    ad_vs = _column("ad_v", "AD voltage R")
+    ad_os = _column("ad_o", "AD voltage theta")
+    freqs = _column("freq", "frequencies measured")
+    #a line of the csv: the timestamp then every column of data
+    _csv_format = "%s" + ",%.15g"*len(columns) + ","
+    #bytes buffered before writing to a csv file opened for many lines
+    _csv_buffering = 1 << 20
+    #lines multi_measure collects before writing them to the csv at once
+    csv_chunk_rows = 1024
 
     def _open_gpib_num(self, address, gpib=0):
         """
@@ -44,11 +145,15 @@ class HallDataR:
         """
         _addr = int(address)
         _gpib = int(gpib)
-        return self.rm.open_resource("GPIB" 
-                                     + repr(_gpib) 
-                                     + "::" 
-                                     + repr(_addr) 
-                                     + "::INSTR")
+        instrument = self.rm.open_resource("GPIB" 
+                                           + repr(_gpib) 
+                                           + "::" 
+                                           + repr(_addr) 
+                                           + "::INSTR")
+        #read each response in one transfer instead of many small ones
+        instrument.chunk_size = 20480
+        instrument.read_termination = '\n'
+        return instrument
     
     def __init__(self, lockin1_addr=1, lockin2_addr=2, lockin3_addr=9,
                  dmm_addr=16, mag_ctrl_addr=22):
@@ -69,19 +174,48 @@ class HallDataR:
         self.dmm = self._open_gpib_num(dmm_addr)
         self.mag_ctrl = self._open_gpib_num(mag_ctrl_addr)
         self.lockins = [self.lockin1, self.lockin2, self.lockin3]
-        self.times = []  # time that sample i was taken at
-        self.diodevs = []  # temperature sensing diode voltages
-        self.currs = []  # currents through the magnet
-        self.fields = [] # magnetic field in tesla (== coil constant * currs)
-        self.ef_vs = []
-        self.ef_os = []
-        self.bf_vs = []
-        self.bf_os = []
-        self.ad_vs = []
-        self.ad_os = []
-        self.freqs = []  # list of frequencies measured
-        self.data = [self.diodevs, self.currs, self.fields, self.ef_vs,
-        self.ef_os, self.bf_vs, self.bf_os, self.ad_vs, self.ad_os, self.freqs]
+        self._freq = None  # lockin1's frequency, read by refresh_frequency
+        #one worker per instrument, so measure can query them all at once
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(self.lockins) + 2)
+        #measurements are stored in a preallocated record array, one record
+        #per sample. Only the first _i records hold data
+        self._i = 0
+        self._rec = np.empty(0, dtype=self.record_dtype)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the worker threads measure uses to query the instruments.
+        measure can't be used afterwards
+        """
+        self._pool.shutdown()
+
+    @property
+    def data(self):
+        """
+        list of every measurement column except times
+        """
+        return [self._rec[name][:self._i] for name in self.columns]
+
+    def preallocate(self, n):
+        """
+        Makes room for n more measurements so that measure doesn't have to
+        grow the buffers while sampling. Recorded measurements are kept
+        
+        :param n: the number of measurements to make room for
+        """
+        size = self._i + n
+        if size <= len(self._rec):
+            return
+        rec = np.empty(size, dtype=self.record_dtype)
+        rec[:self._i] = self._rec[:self._i]
+        self._rec = rec
         
     def __str__(self):
         """
@@ -89,18 +223,59 @@ class HallDataR:
         
         :returns: a string representation of this object
         """
-        return ("Times: " + str(self.times) + '\n' 
-                + "Diode Voltages: " + str(self.diodevs) + '\n'
-                + "Magnet Currents: " + str(self.currs) + '\n'
-                + "Magnetic Fields: " + str(self.fields) + '\n'
-                + "EF Voltage R: " + str(self.ef_vs) + '\n'
-                + "EF Voltage thetas: " + str(self.ef_os) + '\n'
-                + "BF Voltage R: " + str(self.bf_vs) + '\n'
-                + "BF Voltage thetas: " + str(self.bf_os) + '\n'
-                + "AD Voltage R: " + str(self.ad_vs) + '\n'
-                + "AD Voltage thetas: " + str(self.ad_os) + '\n'
-                + "Frequencies: " + str(self.freqs) + '\n')
+        #threshold keeps numpy from summarizing long arrays with "..."
+        return "".join(label + ": "
+                       + np.array2string(values, threshold=sys.maxsize,
+                                         separator=', ')
+                       + '\n' for label, values in (
+            ("Times", self.times),
+            ("Diode Voltages", self.diodevs),
+            ("Magnet Currents", self.currs),
+            ("Magnetic Fields", self.fields),
+            ("EF Voltage R", self.ef_vs),
+            ("EF Voltage thetas", self.ef_os),
+            ("BF Voltage R", self.bf_vs),
+            ("BF Voltage thetas", self.bf_os),
+            ("AD Voltage R", self.ad_vs),
+            ("AD Voltage thetas", self.ad_os),
+            ("Frequencies", self.freqs)))
                 
+    def _format_line(self, i):
+        """
+        Formats the i-th measurement as a line of a csv file
+        
+        :param i: the index of the measurement to format
+        :returns: the csv line, including the trailing newline
+        """
+        #formatted like export_to_csv, which always includes microseconds
+        stamp = np.datetime_as_string(self._rec["time"][i])
+        return (self._csv_format % ((stamp,) + self._rec[i].item()[1:])
+                + '\n')
+
+    def _write_lines(self, csv, lines):
+        """
+        Writes lines taken from a queue to an open csv file until None is
+        received. Runs on a background thread so that file I/O doesn't delay
+        measurements. Lines are written csv_chunk_rows at a time. If writing
+        fails the error is stored in _write_error and the remaining lines are
+        discarded, for multi_measure to raise
+        
+        :param csv: the open csv file to write to
+        :param lines: the queue.Queue of lines to write
+        """
+        try:
+            chunk = []
+            for line in iter(lines.get, None):
+                chunk.append(line)
+                if len(chunk) >= self.csv_chunk_rows:
+                    csv.write(''.join(chunk))
+                    chunk.clear()
+            csv.write(''.join(chunk))
+        except Exception as err:
+            self._write_error = err
+            for _ in iter(lines.get, None):
+                pass
+
     def write_line_to_csv(self, filename, i):
         """
         Appends the i-th measurement to a csv file
@@ -108,12 +283,7 @@ class HallDataR:
         :param filename: the name of the csv file to append to
         """
         with open(filename, "a") as csv:
-            csv.write(self.times[i].isoformat())
-            csv.write(',')
-            for datum in self.data:
-                csv.write(str(datum))
-                csv.write(',')
-            csv.write('\n')
+            csv.write(self._format_line(i))
 
         
     def export_to_csv(self, filename):
@@ -122,9 +292,12 @@ class HallDataR:
         
         :param filename: the name of the csv file to append
         """
-        with open(filename, "a") as csv:
-            for i in range(len(self.times)):
-                self.write_line_to_csv(filename, i)
+        rows = np.empty((self._i, 1 + len(self.columns)), dtype=object)
+        rows[:, 0] = np.datetime_as_string(self.times)
+        for k, name in enumerate(self.columns, 1):
+            rows[:, k] = self._rec[name][:self._i]
+        with open(filename, "a", buffering=self._csv_buffering) as csv:
+            np.savetxt(csv, rows, fmt=self._csv_format)
         
     def import_from_csv(self, filename):
         """
@@ -132,18 +305,21 @@ class HallDataR:
         
         :param filename: the name of the csv file from which to read
         """
-        self.times.clear()
-        for datum in data:
-            datum.clear()
         with open(filename, 'r') as csv:
-            for line in csv:
-                data = line.split(',')
-                #if csv has ",," this removes empty string
-                new_data = [value for value in data if value != '']
-                timestamp = dateutil.parser.parse(new_data[0])
-                self.times.append(timestamp)
-                for i,datum in enumerate(data):
-                    self.datum.append(float(new_data[i]))
+            lines = csv.readlines()
+        #lines end in ',' so the column after the data is empty
+        stamps = np.loadtxt(lines, dtype=str, delimiter=',', usecols=0,
+                            ndmin=1)
+        values = np.loadtxt(lines, delimiter=',',
+                            usecols=range(1, 1 + len(self.columns)), ndmin=2)
+        self._i = 0
+        self.preallocate(len(values))
+        #timestamps are always ISO 8601, which numpy parses directly
+        self._rec["time"][:len(stamps)] = stamps.astype(
+            self.record_dtype["time"])
+        for k, name in enumerate(self.columns):
+            self._rec[name][:len(values)] = values[:, k]
+        self._i = len(values)
 
     def multi_measure(self, fields, filename):
         """
@@ -154,12 +330,34 @@ class HallDataR:
         :param filename: the filename of the csv file to append to
         """
         starttime = time.time()
-        for field in fields:
-            self.change_field(field)
-            for _ in range(5):
-                time.sleep(3*self.time_constants[self.time_constant])
-                index = self.measure()
-                self.write_line_to_csv(filename, index)
+        fields = list(fields)
+        self.preallocate(5*len(fields))
+        lines = queue.Queue()
+        #looked up once rather than on every sample
+        settle = 3*self.time_constants[self.time_constant]
+        change_field = self.change_field
+        measure = self.measure
+        format_line = self._format_line
+        put = lines.put
+        self._write_error = None
+        with open(filename, "a", buffering=self._csv_buffering) as csv:
+            writer = threading.Thread(target=self._write_lines,
+                                      args=(csv, lines), daemon=True)
+            writer.start()
+            try:
+                for field in fields:
+                    change_field(field)
+                    with _Metronome(settle) as tick:
+                        for _ in range(5):
+                            tick.wait()
+                            put(format_line(measure()))
+                    if self._write_error is not None:
+                        break  # Stop sweeping, the data can't be saved
+            finally:
+                lines.put(None)
+                writer.join()
+        if self._write_error is not None:
+            raise self._write_error
         self.mag_ctrl.write("CONF:CURR:PROG " + str(0))
 
     def measure(self):
@@ -168,18 +366,28 @@ class HallDataR:
         
         :returns: the index of the measurement just recorded
         """
-        self.times.append(datetime.datetime.now())
-        self.diodevs.append(self.measure_diode())
-        self.currs.append(self.measure_current())
-        self.fields.append(self.measure_field())
-        self.bf_vs.append(self.measure_r_lockin(0))
-        self.bf_os.append(self.measure_o_lockin(0))
-        self.ef_vs.append(self.measure_r_lockin(1))
-        self.ef_vs.append(self.measure_o_lockin(1))
-        self.ad_vs.append(self.measure_r_lockin(2))
-        self.ad_vs.append(self.measure_o_lockin(2))
-        self.freqs.append(self.measure_frequency())
-        return len(self.times)-1
+        if self._i == len(self._rec):
+            #out of room, double the records
+            self.preallocate(max(self._i, 16))
+        i = self._i
+        #the instruments are queried concurrently, so that each waits for
+        #its reply while the others are being read
+        submit = self._pool.submit
+        now = datetime.datetime.now()
+        diodev = submit(self.measure_diode)
+        magnet = submit(self._measure_magnet)
+        lockins = [submit(self.measure_lockin, lockin_num)
+                   for lockin_num in range(len(self.lockins))]
+        #let every query finish before any error is raised, so none is left
+        #talking to an instrument behind the caller's back
+        concurrent.futures.wait([diodev, magnet] + lockins)
+        curr, field = magnet.result()
+        (bf_v, bf_o), (ef_v, ef_o), (ad_v, ad_o) = [lockin.result()
+                                                    for lockin in lockins]
+        self._rec[i] = (now, diodev.result(), curr, field, ef_v, ef_o,
+                        bf_v, bf_o, ad_v, ad_o, self.measure_frequency())
+        self._i += 1
+        return i
         
     def setup(self, freq=517.94746792, time_constant=7):
         """
@@ -190,37 +398,39 @@ class HallDataR:
         self.time_constant = time_constant
         self.coil_constant = .06914
 
-        for lockin in self.lockins:
-            lockin.write("*RST")  # Reset all settings
-            lockin.write("OUTX 1")  # Set to output to GPIB
-            lockin.write("ISRC 1")  # Set to A-B mode
-            lockin.write("IGND 1")  # Set Ground to Chassis Ground
-            lockin.write("ICPL 1")  # Set input coupling to DC (ac seems broken)
-            # lockin.write("DDEF 1 1 0")  # Doesn't work
-            # lockin.write("DDEF 2 1 0")  # Doesn't work
-            lockin.write("OFLT " + str(self.time_constant))
-        #lockin1 generates function (internal refrence source)
-        self.lockin1.write("FMOD 1")
+        #commands for each instrument are sent as one message, separated by
+        #semicolons, so setup takes one GPIB transaction per instrument.
+        #SCPI reads a header after ';' relative to the previous command, so
+        #the magnet controller's commands are separated with ';:' to start
+        #each from the root
+        lockin_setup = ["*RST",  # Reset all settings
+                        "OUTX 1",  # Set to output to GPIB
+                        "ISRC 1",  # Set to A-B mode
+                        "IGND 1",  # Set Ground to Chassis Ground
+                        "ICPL 1",  # Set input coupling to DC (ac seems broken)
+                        # "DDEF 1 1 0",  # Doesn't work
+                        # "DDEF 2 1 0",  # Doesn't work
+                        "OFLT " + str(self.time_constant)]
+        self.lockin1.write(";".join(lockin_setup + [
+            "FMOD 1",  # Generate function (internal refrence source)
+            "FREQ " + str(self.freq),  # Set frequency to freq Hz
+            "SLVL 1.0",  # Set amplitude to 1V
+            "SENS 26"]))  # Set sensitivity to 1V
         #lockin2 recieves signal from lockin1 (external reference source)
-        self.lockin2.write("FMOD 0")
-        self.lockin3.write("FMOD 2")
-        #set lockin1 frequency to freq Hz
-        self.lockin1.write("FREQ " + str(self.freq))
-        #set lockin1 amplitude to 1V
-        self.lockin1.write("SLVL 1.0")
-        #set lockin1 sensitivity to 1V
-        self.lockin1.write("SENS 26")
-        
-        self.dmm.write("*RST")
-        self.dmm.write("CONF:VOLT:DC")
-
-        self.mag_ctrl.write("CONF:CURR:MAX 72")
-        self.mag_ctrl.write("CONF:COIL "+ self.coil_constant)
-        self.mag_ctrl.write("CONF:FIELD:UNITS:1")
-        self.mag_ctrl.write("CONF:PS 1")
-        self.mag_ctrl.write("CONF:PS:CURR 53")
-        self.mag_ctrl.write("PS 1")
-        self.mag_ctrl.write("CONF:STAB 50")
+        self.lockin2.write(";".join(lockin_setup + ["FMOD 0"]))
+        self.lockin3.write(";".join(lockin_setup + ["FMOD 2"]))
+        
+        self.dmm.write("*RST;CONF:VOLT:DC")
+
+        self.mag_ctrl.write(";:".join([
+            "CONF:CURR:MAX 72",
+            "CONF:COIL " + str(self.coil_constant),
+            "CONF:FIELD:UNITS:1",
+            "CONF:PS 1",
+            "CONF:PS:CURR 53",
+            "PS 1",
+            "CONF:STAB 50"]))
+        self.refresh_frequency()
     
     def id_instruments(self):  # remove this function?
         """
@@ -241,6 +451,23 @@ class HallDataR:
         self.current = current
         mag_ctrl.write('CONF:CURR:PROG ' + current)
 
+    def _ramp(self, query, target):
+        """
+        Starts a ramp of the magnet controller and blocks until the reading
+        is within 10% of target, polling every 100 ms
+        
+        :param query: the query that reads the ramped quantity
+        :param target: the programmed value of the ramped quantity
+        """
+        self.mag_ctrl.write("RAMP")
+        with _Metronome(.1) as tick:
+            while True:
+                value = self.mag_ctrl.query_ascii_values(query,
+                                                         converter='f')[0]
+                if .9*target <= value <= 1.1*target:
+                    break
+                tick.wait()
+
     def change_current(self, amps):
         """
         Sets the current through the magnet. Blocks until desired current is
@@ -249,10 +476,7 @@ class HallDataR:
         :param amps: the desired amperage through the magnet
         """
         self.mag_ctrl.write("CONF:CURR:PROG " + str(amps))
-        self.mag_ctrl.write('RAMP')
-        while (float(self.mag_ctrl.query("CURR:MAG?")) > 1.1*amps
-               or float(self.mag_ctrl.query("CURR:MAG?")) < .9*amps):
-            time.sleep(.1)
+        self._ramp("CURR:MAG?", amps)
         time.sleep(.5)
         self.mag_ctrl.write("PAUSE")
         
@@ -264,10 +488,7 @@ class HallDataR:
         :param field: the desired magnetic field of the magnet in tesla
         """
         self.mag_ctrl.write("CONF:FIELD:PROG " + str(field))
-        self.mag_ctrl.write('RAMP')
-        while (float(self.mag_ctrl.query("FIELD:MAG?")) > 1.1*field
-               or float(self.mag_ctrl.query("FIELD:MAG?")) < .9*field):
-            pass
+        self._ramp("FIELD:MAG?", field)
         time.sleep(.5)
         self.mag_ctrl.write("PAUSE")
 
@@ -277,15 +498,56 @@ class HallDataR:
         
         :param freq: the desired frequenct of lockin 1
         """
+        self.freq = freq
         self.lockin1.write("FREQ " + str(freq))
+        self.refresh_frequency()
     
+    def _setting_number(self, settings, index, value):
+        """
+        Finds the setting number of a value. Values that aren't settings are
+        rounded up to the next setting (or down to the largest)
+        
+        :param settings: the sorted list of settings, e.g. time_constants
+        :param index: the dictionary from setting to setting number
+        :param value: the value to find the setting number of
+        :returns: the setting number of value
+        """
+        try:
+            return index[value]
+        except KeyError:
+            return min(bisect.bisect_left(settings, value), len(settings) - 1)
+
+    def set_time_constant(self, seconds):
+        """
+        Sets the time constant of every lockin
+        
+        :param seconds: the desired time constant in seconds. Rounded up to
+                        the next time constant the lockins support
+        """
+        self.time_constant = self._setting_number(self.time_constants,
+                                                  self._tc_index, seconds)
+        for lockin in self.lockins:
+            lockin.write("OFLT " + str(self.time_constant))
+
+    def set_sensitivity(self, lockin_num, volts):
+        """
+        Sets the sensitivity of a lockin amplifier
+        
+        :param lockin_num: the number of the lockin amplifier to set
+        :param volts: the desired sensitivity in volts. Rounded up to the next
+                      sensitivity the lockins support
+        """
+        sensitivity = self._setting_number(self.sensitivities,
+                                           self._sens_index, volts)
+        self.lockins[lockin_num].write("SENS " + str(sensitivity))
+
     def measure_diode(self):
         """
         Gets the voltage across the diode from the digital multimeter
         
         :returns: the voltage across the diode
         """
-        return float(self.dmm.query("READ?"))
+        return self.dmm.query_ascii_values("READ?", converter='f')[0]
 
     def measure_r_lockin(self, lockin_num):
         """
@@ -294,7 +556,8 @@ class HallDataR:
         :param lockin_num: the number of the lockin amplifier to measure
         :returns: R (as in ploar coordinates) of lockin number lockin_num
         """
-        return float(self.lockins[lockin_num].query("OUTP? 3"))
+        return self.lockins[lockin_num].query_ascii_values(
+            "OUTP? 3", converter='f')[0]
 
     def measure_o_lockin(self, lockin_num):
         """
@@ -303,15 +566,45 @@ class HallDataR:
         :param lockin_num: the number of the lockin amplifier to measure
         :returns: theta (as in ploar coordinates) of lockin number lockin_num
         """
-        return float(self.lockins[lockin_num].query("OUTP? 4"))
+        return self.lockins[lockin_num].query_ascii_values(
+            "OUTP? 4", converter='f')[0]
+
+    def measure_lockin(self, lockin_num):
+        """
+        Measure R and theta of a lockin amplifier in a single query. SNAP?
+        samples both values at the same instant, unlike two OUTP? queries
+        
+        :param lockin_num: the number of the lockin amplifier to measure
+        :returns: (R, theta) (as in ploar coordinates) of lockin number
+                  lockin_num
+        """
+        r, theta = self.lockins[lockin_num].query_ascii_values(
+            "SNAP? 3,4", converter='f', separator=',')
+        return r, theta
 
     def measure_frequency(self):
         """
-        Measure the frequency of lockin1
+        Get the frequency of lockin1. lockin1 is the reference source, so its
+        frequency only changes when set, and the value read back by setup or
+        set_freq is returned without querying the instrument. If neither has
+        been called yet, the frequency is queried once
         
         :returns: frequency in hertz of lockin1
         """
-        return float(self.lockin1.query("FREQ?"))
+        if self._freq is None:
+            return self.refresh_frequency()
+        return self._freq
+
+    def refresh_frequency(self):
+        """
+        Query the frequency of lockin1, updating the value returned by
+        measure_frequency
+        
+        :returns: frequency in hertz of lockin1
+        """
+        self._freq = self.lockin1.query_ascii_values("FREQ?",
+                                                     converter='f')[0]
+        return self._freq
 
     def measure_field(self):
         """
@@ -319,7 +612,18 @@ class HallDataR:
         
         :returns: the field strength of the magnet
         """
-        return float(self.mag_ctrl.query("FIELD:MAG?"))
+        return self.mag_ctrl.query_ascii_values("FIELD:MAG?",
+                                                converter='f')[0]
+
+    def _measure_magnet(self):
+        """
+        Measure the current through the magnet and its field strength. Both
+        queries go to the magnet controller, so they are made one after the
+        other
+        
+        :returns: (current in amperes, field strength in tesla)
+        """
+        return self.measure_current(), self.measure_field()
 
     def measure_current(self):
         """
@@ -327,4 +631,4 @@ class HallDataR:
         
         :returns: the current through the magnet in amperes
         """
-        return float(self.mag_ctrl.query("CURR:MAG?"))
+        return self.mag_ctrl.query_ascii_values("CURR:MAG?", converter='f')[0]